@@ -0,0 +1,239 @@
+"""
+Локальный HTTP JSON API для расчета влажности по психрометру ВИТ-1
+
+Запуск отдельно от бота:
+    python api_server.py --host 127.0.0.1 --port 8080 [--photo]
+
+Вместе с ботом сервис запускается из main.py, если задан API_PORT.
+"""
+
+import argparse
+import asyncio
+import base64
+import json
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from aiohttp import web
+
+from config import get_openai_api_key
+from photo_analysis import analyze_images_with_openai
+from psychrometric_calculator import calculate_humidity, calculate_humidity_batch
+
+# Сколько строк NDJSON обрабатывается и отправляется за один раз
+NDJSON_CHUNK_SIZE = 1000
+
+# Максимальный размер тела запроса (байт) для JSON и фотографий
+MAX_BODY_SIZE = 32 * 1024 * 1024
+
+NDJSON_CONTENT_TYPE = 'application/x-ndjson'
+
+# Процессы для JSON-пакетов: разбор и сериализация больших тел держат GIL,
+# поэтому поток не спасает event loop (вместе с API в нем работает бот).
+# Процессы запускаются через spawn и заново импортируют запускающий модуль: при старте
+# из main.py каждый воркер импортирует его как __mp_main__ и создает свои bot, dp,
+# ReadingsStore и ReminderScheduler. Сетевых запросов и файлов баз при этом нет
+# (опрос Telegram и start() вызываются только под if __name__ == '__main__'),
+# но это лишние время и память на каждый воркер.
+# Сам расчет calculate_humidity_batch - обычный цикл Python по сетке таблицы,
+# а не векторизованный (numpy) расчет: процессы разгружают event loop, но не ускоряют счет.
+BATCH_WORKERS = 2
+
+
+def json_response(data, status: int = 200) -> web.Response:
+    return web.json_response(data, status=status,
+                             dumps=lambda value: json.dumps(value, ensure_ascii=False))
+
+
+def error_response(error: str, status: int = 400) -> web.Response:
+    return json_response({"success": False, "error": error}, status)
+
+
+def parse_reading(item) -> Optional[tuple]:
+    """Пара (t_dry, t_wet) из {"t_dry": .., "t_wet": ..} или [t_dry, t_wet], иначе None"""
+    try:
+        if isinstance(item, dict):
+            return float(item["t_dry"]), float(item["t_wet"])
+        if isinstance(item, (list, tuple)) and len(item) == 2:
+            return float(item[0]), float(item[1])
+    except (KeyError, TypeError, ValueError):
+        pass
+    return None
+
+
+def calculate_readings(items: list) -> list:
+    """Пакетный расчет; некорректные элементы получают ошибку на своем месте"""
+    readings = [parse_reading(item) for item in items]
+    results = calculate_humidity_batch([reading for reading in readings if reading is not None])
+
+    calculated = iter(results)
+    return [
+        next(calculated) if reading is not None
+        else {"success": False, "error": "Ожидается {\"t_dry\": число, \"t_wet\": число} или [t_dry, t_wet]"}
+        for reading in readings
+    ]
+
+
+async def health(request: web.Request) -> web.Response:
+    return json_response({"status": "ok", "photo": request.app["photo"]})
+
+
+async def humidity(request: web.Request) -> web.Response:
+    """POST /api/humidity: {"t_dry": 20, "t_wet": 15}"""
+    try:
+        reading = parse_reading(await request.json())
+    except ValueError:
+        return error_response("Тело запроса должно быть JSON")
+
+    if reading is None:
+        return error_response("Ожидается {\"t_dry\": число, \"t_wet\": число}")
+
+    result = calculate_humidity(*reading)
+    result.pop("result_text", None)
+    return json_response(result)
+
+
+async def humidity_batch(request: web.Request) -> web.StreamResponse:
+    """
+    POST /api/humidity/batch
+
+    JSON: {"readings": [[20, 15], {"t_dry": 22, "t_wet": 19}, ...]} -> {"results": [...]}
+    NDJSON (Content-Type: application/x-ndjson): по показанию на строку,
+    ответ построчно в том же порядке, без загрузки всего тела в память.
+    """
+    if request.content_type == NDJSON_CONTENT_TYPE:
+        return await humidity_batch_ndjson(request)
+
+    # Тело до MAX_BODY_SIZE разбирается, считается и сериализуется в отдельном процессе
+    body = await request.read()
+    loop = asyncio.get_running_loop()
+    try:
+        content = await loop.run_in_executor(request.app["batch_executor"], calculate_batch_body, body)
+    except ValueError as e:
+        return error_response(str(e))
+
+    return web.Response(body=content, content_type='application/json', charset='utf-8')
+
+
+def calculate_batch_body(body: bytes) -> bytes:
+    """JSON-тело пакетного запроса -> JSON-ответ; ValueError с текстом ошибки для клиента"""
+    try:
+        data = json.loads(body)
+    except ValueError:
+        raise ValueError("Тело запроса должно быть JSON")
+
+    items = data.get("readings") if isinstance(data, dict) else data
+    if not isinstance(items, list):
+        raise ValueError("Ожидается {\"readings\": [...]}")
+
+    return json.dumps({"results": calculate_readings(items)}, ensure_ascii=False).encode('utf-8')
+
+
+async def humidity_batch_ndjson(request: web.Request) -> web.StreamResponse:
+    response = web.StreamResponse(headers={"Content-Type": NDJSON_CONTENT_TYPE})
+    await response.prepare(request)
+
+    async def flush(items: list):
+        results = calculate_readings(items)
+        lines = "".join(json.dumps(result, ensure_ascii=False) + "\n" for result in results)
+        await response.write(lines.encode('utf-8'))
+
+    items = []
+    async for line in request.content:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            items.append(json.loads(line))
+        except ValueError:
+            items.append(None)
+
+        if len(items) >= NDJSON_CHUNK_SIZE:
+            await flush(items)
+            items = []
+
+    if items:
+        await flush(items)
+
+    await response.write_eof()
+    return response
+
+
+async def photo(request: web.Request) -> web.Response:
+    """
+    POST /api/photo: фотографии психрометра (multipart, одна или несколько,
+    либо одно изображение в теле запроса) -> показания и влажность по каждой
+    """
+    images = []
+    if request.content_type.startswith('multipart/'):
+        reader = await request.multipart()
+        async for part in reader:
+            if part.filename or (part.headers.get('Content-Type') or '').startswith('image/'):
+                images.append(base64.b64encode(await part.read()).decode('utf-8'))
+    else:
+        content = await request.read()
+        if content:
+            images.append(base64.b64encode(content).decode('utf-8'))
+
+    if not images:
+        return error_response("Не передано ни одной фотографии")
+
+    results = []
+    for photo_data in await analyze_images_with_openai(images):
+        if photo_data["success"]:
+            result = calculate_humidity(photo_data["t_dry"], photo_data["t_wet"])
+            result.pop("result_text", None)
+            results.append(result)
+        else:
+            results.append(photo_data)
+
+    return json_response({"results": results})
+
+
+def create_app(photo_enabled: bool = False) -> web.Application:
+    """Приложение aiohttp; эндпоинт фото требует OPENAI_API_KEY"""
+    app = web.Application(client_max_size=MAX_BODY_SIZE)
+    app["photo"] = photo_enabled
+    # Процессы запускаются при первом JSON-пакете
+    app["batch_executor"] = ProcessPoolExecutor(
+        max_workers=BATCH_WORKERS, mp_context=multiprocessing.get_context('spawn')
+    )
+    app.on_cleanup.append(shutdown_batch_executor)
+    app.router.add_get('/api/health', health)
+    app.router.add_post('/api/humidity', humidity)
+    app.router.add_post('/api/humidity/batch', humidity_batch)
+    if photo_enabled:
+        app.router.add_post('/api/photo', photo)
+    return app
+
+
+async def shutdown_batch_executor(app: web.Application):
+    app["batch_executor"].shutdown()
+
+
+async def start_api(host: str, port: int, photo_enabled: bool = False) -> web.AppRunner:
+    """Запустить API в текущем event loop (например, вместе с ботом)"""
+    if photo_enabled:
+        get_openai_api_key()
+    runner = web.AppRunner(create_app(photo_enabled))
+    await runner.setup()
+    await web.TCPSite(runner, host, port).start()
+    logging.info(f"🌐 HTTP API запущен на http://{host}:{port}")
+    return runner
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+
+    parser = argparse.ArgumentParser(description="HTTP API расчета влажности ВИТ-1")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--photo', action='store_true', help="включить /api/photo (нужен OPENAI_API_KEY)")
+    args = parser.parse_args()
+
+    # Без ключа /api/photo падал бы на каждом запросе: сообщаем об этом при запуске
+    if args.photo:
+        get_openai_api_key()
+    web.run_app(create_app(args.photo), host=args.host, port=args.port)
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Замер времени импорта модулей бота (холодный старт)
+
+Каждый модуль импортируется в отдельном процессе несколько раз, выводится медиана.
+Модули, кроме main, импортируются без ключей в окружении.
+
+    python benchmark_import.py [--repeat 5] [модуль ...]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+MODULES = [
+    'psychrometric_calculator',
+    'config',
+    'inline_answers',
+    'photo_analysis',
+    'api_server',
+    'main',
+]
+
+# main нужен токен бота; фиктивного достаточно, сеть при импорте не используется
+MODULE_ENV = {
+    'main': {'BOT_TOKEN': '123456:benchmark'},
+}
+
+SNIPPET = (
+    "import time; start = time.perf_counter(); import {module}; "
+    "print((time.perf_counter() - start) * 1000)"
+)
+
+
+def measure(module: str, repeat: int) -> list:
+    """Время импорта модуля (мс) в свежих процессах"""
+    env = {key: value for key, value in os.environ.items()
+           if key not in ('BOT_TOKEN', 'OPENAI_API_KEY')}
+    env.update(MODULE_ENV.get(module, {}))
+
+    timings = []
+    for _ in range(repeat):
+        result = subprocess.run(
+            [sys.executable, '-c', SNIPPET.format(module=module)],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            env=env, capture_output=True, text=True
+        )
+        if result.returncode != 0:
+            raise RuntimeError(f"Не удалось импортировать {module}:\n{result.stderr}")
+        timings.append(float(result.stdout.strip().splitlines()[-1]))
+    return timings
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Время импорта модулей бота")
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('modules', nargs='*', default=MODULES)
+    args = parser.parse_args()
+
+    print("⏱️ Время импорта (мс): медиана / минимум")
+    print("=" * 50)
+    for module in args.modules:
+        timings = measure(module, args.repeat)
+        print(f"{module:<26} {statistics.median(timings):8.1f} / {min(timings):8.1f}")
@@ -1,16 +1,64 @@
+"""
+Конфигурация бота
+
+Переменные окружения (и .env) читаются при первом обращении к настройке, а обязательные
+ключи проверяются только там, где они нужны: ручной расчет и HTTP API работают
+без OPENAI_API_KEY, а psychrometric_calculator не требует никаких ключей.
+"""
+
 import os
-from dotenv import load_dotenv
+from typing import Optional
+
+# Обязательные для своих функций настройки
+REQUIRED_SETTINGS = ('BOT_TOKEN', 'OPENAI_API_KEY')
+
+# Необязательные настройки и значения по умолчанию:
+# HTTP API (запускается вместе с ботом, если задан API_PORT),
+# файлы SQLite с историей показаний и расписаниями напоминаний
+OPTIONAL_SETTINGS = {
+    'API_HOST': '127.0.0.1',
+    'API_PORT': None,
+    'READINGS_DB': 'readings.db',
+    'REMINDERS_DB': 'reminders.db',
+}
+
+_environment_loaded = False
+
+
+def load_environment():
+    """Загружаем переменные окружения из .env (один раз)"""
+    global _environment_loaded
+    if not _environment_loaded:
+        from dotenv import load_dotenv
+        load_dotenv()
+        _environment_loaded = True
+
+
+def get_setting(name: str, default: Optional[str] = None) -> Optional[str]:
+    load_environment()
+    return os.getenv(name, default)
+
+
+def require_setting(name: str) -> str:
+    """Значение обязательной настройки или ValueError, если она не задана"""
+    value = get_setting(name)
+    if not value:
+        raise ValueError(f"{name} не найден в переменных окружения!")
+    return value
+
+
+def get_bot_token() -> str:
+    return require_setting('BOT_TOKEN')
+
 
-# Загружаем переменные окружения
-load_dotenv()
+def get_openai_api_key() -> str:
+    return require_setting('OPENAI_API_KEY')
 
-# Конфигурация бота
-BOT_TOKEN = os.getenv('BOT_TOKEN')
-OPENAI_API_KEY = os.getenv('OPENAI_API_KEY')
 
-# Проверяем наличие токенов
-if not BOT_TOKEN:
-    raise ValueError("BOT_TOKEN не найден в переменных окружения!")
-    
-if not OPENAI_API_KEY:
-    raise ValueError("OPENAI_API_KEY не найден в переменных окружения!")
+def __getattr__(name: str):
+    # Настройки как атрибуты модуля: читаются и проверяются при обращении
+    if name in REQUIRED_SETTINGS:
+        return require_setting(name)
+    if name in OPTIONAL_SETTINGS:
+        return get_setting(name, OPTIONAL_SETTINGS[name])
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
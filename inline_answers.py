@@ -0,0 +1,96 @@
+"""
+Готовые ответы для инлайн-режима: @bot Tсух Tвлажн
+Результаты рассчитываются один раз (при первом запросе) по всей области психрометрической таблицы
+"""
+
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+from aiogram.types import InlineQueryResultArticle, InputTextMessageContent
+
+from psychrometric_calculator import calculate_humidity, get_psychrometric_table
+
+# Сколько секунд Telegram может кэшировать инлайн-ответы на своей стороне
+INLINE_CACHE_TIME = 86400
+
+# Шаг показаний термометров, для которого ответы считаются заранее
+READING_STEP = 0.5
+
+
+def render_result(result: dict) -> str:
+    """Текст результата расчета в формате Markdown"""
+    if not result["success"]:
+        return f"❌ {result['error']}"
+
+    response = f"🌡️ *Результат расчета:*\n\n"
+    response += f"Температура воздуха: {result['t_dry']} °C\n"
+    response += f"Разница: ΔT = {result['delta_t']} °C\n"
+    response += f"Влажность ≈ {result['humidity']}%"
+    return response
+
+
+def build_article(t_dry: float, t_wet: float) -> InlineQueryResultArticle:
+    """Инлайн-ответ для пары показаний"""
+    result = calculate_humidity(t_dry, t_wet)
+    if result["success"]:
+        title = f"Влажность ≈ {result['humidity']}%"
+    else:
+        title = "Ошибка расчета"
+
+    return InlineQueryResultArticle(
+        id=f"{t_dry}_{t_wet}",
+        title=title,
+        description=f"Tсух = {t_dry} °C, Tвлажн = {t_wet} °C",
+        input_message_content=InputTextMessageContent(render_result(result), parse_mode='Markdown')
+    )
+
+
+@lru_cache(maxsize=None)
+def get_answer_cache() -> Dict[Tuple[float, float], InlineQueryResultArticle]:
+    """Ответы для всех показаний с шагом READING_STEP в пределах таблицы (строятся один раз)"""
+    table = get_psychrometric_table()
+    temperatures = list(table.keys())
+    deltas = list(table[temperatures[0]].keys())
+    steps_per_degree = round(1 / READING_STEP)
+
+    cache = {}
+    for i in range(min(temperatures) * steps_per_degree, max(temperatures) * steps_per_degree + 1):
+        t_dry = i / steps_per_degree
+        for j in range(round(max(deltas) * steps_per_degree) + 1):
+            t_wet = t_dry - j / steps_per_degree
+            cache[(t_dry, t_wet)] = build_article(t_dry, t_wet)
+    return cache
+
+
+HINT_ARTICLE = InlineQueryResultArticle(
+    id="hint",
+    title="Введите показания: Tсух Tвлажн",
+    description="Например: 20 15",
+    input_message_content=InputTextMessageContent(
+        "Расчет влажности по психрометру ВИТ-1: введите показания сухого и влажного термометров, "
+        "например 20 15"
+    )
+)
+
+
+def parse_query(query: str) -> Optional[Tuple[float, float]]:
+    """Показания термометров из текста запроса или None"""
+    data = query.replace(',', '.').strip().split()
+    if len(data) != 2:
+        return None
+    try:
+        return float(data[0]), float(data[1])
+    except ValueError:
+        return None
+
+
+def inline_answer(query: str) -> InlineQueryResultArticle:
+    """Ответ на инлайн-запрос: из кэша, а вне сетки таблицы — расчет на месте"""
+    readings = parse_query(query)
+    if readings is None:
+        return HINT_ARTICLE
+
+    article = get_answer_cache().get(readings)
+    if article is None:
+        article = build_article(*readings)
+    return article
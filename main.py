@@ -1,26 +1,61 @@
+import asyncio
 import logging
-import re
-import requests
 import base64
-from aiogram import Bot, Dispatcher, executor, types
+import tempfile
+from datetime import datetime
+from typing import List, Optional
+from aiogram import Dispatcher, executor, types
 from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton, CallbackQuery
 from aiogram.contrib.fsm_storage.memory import MemoryStorage
 from aiogram.dispatcher import FSMContext
 from aiogram.dispatcher.filters.state import State, StatesGroup
+from aiogram.utils.exceptions import BotBlocked, ChatNotFound, RetryAfter, UserDeactivated
 from psychrometric_calculator import calculate_humidity
-from config import BOT_TOKEN, OPENAI_API_KEY
-from openai import OpenAI
+from config import BOT_TOKEN, API_HOST, API_PORT, READINGS_DB, REMINDERS_DB, get_setting
+from rate_limiter import RateLimitedBot
+from reply_session import ReplySession
+from media_group import MediaGroupCollector
+from photo_analysis import analyze_images_with_openai
+from api_server import start_api
+from inline_answers import INLINE_CACHE_TIME, inline_answer, render_result
+from readings_store import ReadingsStore
+from reminders import ReminderScheduler, format_time, parse_time
 
 # Настройка логирования
 logging.basicConfig(level=logging.INFO)
 
 # Инициализация бота и диспетчера
-bot = Bot(token=BOT_TOKEN)
+bot = RateLimitedBot(token=BOT_TOKEN)
 storage = MemoryStorage()
 dp = Dispatcher(bot, storage=storage)
 
-# Настройка OpenAI
-client = OpenAI(api_key=OPENAI_API_KEY)
+# Сборщик альбомов из нескольких фотографий
+media_groups = MediaGroupCollector()
+
+# История показаний
+readings_store = ReadingsStore(READINGS_DB)
+
+
+async def send_reminder(chat_id: int, minute: int):
+    """Отправка напоминания о замере; недоступные чаты снимаются с расписания"""
+    keyboard = InlineKeyboardMarkup(row_width=1)
+    keyboard.add(
+        InlineKeyboardButton("🚀 Начать расчет влажности", callback_data="start_calculation")
+    )
+    text = f"⏰ Время замера влажности ({format_time(minute)})"
+
+    try:
+        await bot.send_message(chat_id, text, reply_markup=keyboard)
+    except RetryAfter as e:
+        await asyncio.sleep(e.timeout)
+        await bot.send_message(chat_id, text, reply_markup=keyboard)
+    except (BotBlocked, ChatNotFound, UserDeactivated):
+        logging.info(f"🔕 Чат {chat_id} недоступен, напоминания удалены")
+        await reminders.remove_chat(chat_id)
+
+
+# Ежедневные напоминания о замерах
+reminders = ReminderScheduler(REMINDERS_DB, send_reminder)
 
 
 # Состояния для FSM
@@ -44,8 +79,15 @@ async def start_command(message: types.Message):
 
 *Доступные команды:*
 /calculation - начать расчет влажности
+/history - последние показания
+/stats - статистика влажности по дням
+/site - объект, к которому относятся показания
+/export - выгрузить показания в CSV
+/remind - ежедневные напоминания о замерах
 /start - показать это сообщение
 
+В любом чате можно написать @имя\\_бота Tсух Tвлажн для мгновенного расчета
+
 Для начала работы используйте команду /calculation
     """
 
@@ -73,6 +115,132 @@ async def calculation_command(message: types.Message):
     )
 
 
+@dp.message_handler(commands=['history'])
+async def history_command(message: types.Message):
+    """Обработчик команды /history [N]: последние показания чата"""
+    limit = 10
+    args = message.get_args()
+    if args and args.isdigit():
+        limit = max(1, min(int(args), 50))
+
+    rows = await readings_store.history(message.chat.id, limit)
+    if not rows:
+        await message.answer("История показаний пуста. Выполните расчет: /calculation")
+        return
+
+    lines = [f"📋 *Последние показания ({len(rows)}):*\n"]
+    for ts, site, t_dry, t_wet, delta_t, humidity, source in rows:
+        icon = "📷" if source == 'photo' else "📝"
+        moment = datetime.fromtimestamp(ts).strftime('%d.%m %H:%M')
+        place = f" {escape_md(site)}" if site else ""
+        lines.append(f"{icon} {moment}{place}: {t_dry}/{t_wet} °C, ΔT = {delta_t:.1f} °C, {humidity}%")
+
+    await message.answer("\n".join(lines), parse_mode='Markdown')
+
+
+@dp.message_handler(commands=['stats'])
+async def stats_command(message: types.Message):
+    """Обработчик команды /stats [дни]: мин/макс/среднее влажности по дням и объектам"""
+    days = 7
+    args = message.get_args()
+    if args and args.isdigit():
+        days = max(1, min(int(args), 366))
+
+    rows = await readings_store.stats(message.chat.id, days)
+    if not rows:
+        await message.answer(f"Нет показаний за последние {days} дн.")
+        return
+
+    lines = [f"📊 *Влажность за {days} дн.* (мин / сред / макс):\n"]
+    for day, site, count, mean, humidity_min, humidity_max in rows:
+        place = escape_md(site) if site else "—"
+        lines.append(
+            f"{datetime.fromisoformat(day).strftime('%d.%m')} {place}: "
+            f"{humidity_min} / {mean:.0f} / {humidity_max}% ({count} изм.)"
+        )
+
+    await message.answer("\n".join(lines), parse_mode='Markdown')
+
+
+@dp.message_handler(commands=['site'])
+async def site_command(message: types.Message):
+    """Обработчик команды /site [название]: объект для следующих показаний"""
+    site = message.get_args().strip()
+    if not site:
+        current = readings_store.get_site(message.chat.id) or "не задан"
+        await message.answer(
+            f"Текущий объект: {current}\n"
+            "Чтобы сменить, отправьте: /site Название"
+        )
+        return
+
+    await readings_store.set_site(message.chat.id, site[:64])
+    await message.answer(f"✅ Показания будут сохраняться для объекта: {site[:64]}")
+
+
+@dp.message_handler(commands=['export'])
+async def export_command(message: types.Message):
+    """Обработчик команды /export: все показания чата в CSV"""
+    with tempfile.TemporaryFile() as file:
+        count = await readings_store.export_csv(message.chat.id, file)
+        if not count:
+            await message.answer("История показаний пуста.")
+            return
+
+        file.seek(0)
+        await message.answer_document(
+            types.InputFile(file, filename='readings.csv'),
+            caption=f"📄 Показаний: {count}"
+        )
+
+
+@dp.message_handler(commands=['remind'])
+async def remind_command(message: types.Message):
+    """Обработчик команды /remind [ЧЧ:ММ | off ЧЧ:ММ | off]: ежедневные напоминания"""
+    args = message.get_args().split()
+
+    if not args:
+        times = reminders.reminders_for(message.chat.id)
+        current = ", ".join(format_time(minute) for minute in times) if times else "нет"
+        await message.answer(
+            f"⏰ Напоминания о замерах: {current}\n\n"
+            "Добавить: /remind 09:00\n"
+            "Удалить: /remind off 09:00\n"
+            "Удалить все: /remind off"
+        )
+        return
+
+    if args[0] == 'off':
+        if len(args) == 1:
+            await reminders.remove_chat(message.chat.id)
+            await message.answer("🔕 Все напоминания удалены")
+            return
+
+        minute = parse_time(args[1])
+        if minute is None or not await reminders.remove(message.chat.id, minute):
+            await message.answer("Напоминание не найдено. Список: /remind")
+            return
+        await message.answer(f"🔕 Напоминание на {format_time(minute)} удалено")
+        return
+
+    minute = parse_time(args[0])
+    if minute is None:
+        await message.answer("Неверный формат времени! Например: /remind 09:00")
+        return
+
+    if not await reminders.add(message.chat.id, minute):
+        await message.answer("Слишком много напоминаний. Удалите лишние: /remind off ЧЧ:ММ")
+        return
+    await message.answer(f"✅ Буду напоминать о замере каждый день в {format_time(minute)}")
+
+
+def escape_md(text: str) -> str:
+    """Экранирование пользовательского текста для parse_mode='Markdown'"""
+    for char in ('_', '*', '`', '['):
+        text = text.replace(char, '\\' + char)
+    return text
+
+
 @dp.callback_query_handler(lambda c: c.data == "start_calculation")
 async def process_start_calculation(callback_query: CallbackQuery):
     """Обработка кнопки 'Начать расчет влажности'"""
@@ -184,18 +352,11 @@ async def process_manual_data(message: types.Message, state: FSMContext):
             await state.finish()
             return
 
-        # Рассчитываем влажность локально
-        await message.answer("🔍 Рассчитываю влажность...")
-
+        # Рассчитываем влажность локально: расчет мгновенный, сразу отправляем результат
         result = calculate_humidity(t_dry, t_wet)
-
+        response = render_result(result)
         if result["success"]:
-            response = f"🌡️ *Результат расчета:*\n\n"
-            response += f"Температура воздуха: {result['t_dry']} °C\n"
-            response += f"Разница: ΔT = {result['delta_t']} °C\n"
-            response += f"Влажность ≈ {result['humidity']}%"
-        else:
-            response = f"❌ {result['error']}"
+            readings_store.add(message.chat.id, result, 'manual')
 
         # Создаем кнопки для дальнейших действий
         keyboard = InlineKeyboardMarkup(row_width=2)
@@ -232,35 +393,38 @@ async def process_manual_data(message: types.Message, state: FSMContext):
 @dp.message_handler(state=CalculationStates.waiting_for_photo, content_types=['photo'])
 async def process_photo(message: types.Message, state: FSMContext):
     """Обработка фотографии психрометра"""
+    if message.media_group_id:
+        # Альбом обрабатывает первое сообщение группы, остальные только добавляются к нему
+        album = await media_groups.collect(message)
+        if album is not None:
+            await process_photo_album(album, state)
+        return
+
+    reply = ReplySession(message)
     try:
         # Получаем файл фотографии
         photo = message.photo[-1]  # Берем фото наибольшего размера
         file_info = await bot.get_file(photo.file_id)
 
         # Анализируем фото через OpenAI
-        await message.answer("🔍 Анализирую фотографию через OpenAI...")
+        await reply.update("🔍 Анализирую фотографию через OpenAI...")
 
         # Получаем данные с фото через OpenAI
         photo_data = await analyze_photo_with_openai(file_info.file_path)
 
         if photo_data["success"]:
-            await message.answer(
+            readings = (
                 f"📷 *Анализ фотографии:*\n\n"
                 f"Показание сухого термометра: {photo_data['t_dry']}°C\n"
                 f"Показание влажного термометра: {photo_data['t_wet']}°C\n\n"
-                f"🔍 Рассчитываю влажность по таблице..."
             )
+            await reply.update(readings + "🔍 Рассчитываю влажность по таблице...", parse_mode='Markdown')
 
             # Рассчитываем влажность по локальной таблице
             result = calculate_humidity(photo_data['t_dry'], photo_data['t_wet'])
-
+            response = readings + render_result(result)
             if result["success"]:
-                response = f"🌡️ *Результат расчета:*\n\n"
-                response += f"Температура воздуха: {result['t_dry']} °C\n"
-                response += f"Разница: ΔT = {result['delta_t']} °C\n"
-                response += f"Влажность ≈ {result['humidity']}%"
-            else:
-                response = f"❌ {result['error']}"
+                readings_store.add(message.chat.id, result, 'photo')
         else:
             response = f"❌ Ошибка анализа фото: {photo_data['error']}"
 
@@ -271,7 +435,7 @@ async def process_photo(message: types.Message, state: FSMContext):
             InlineKeyboardButton("📷 Фото", callback_data="photo_input")
         )
 
-        await message.answer(response, parse_mode='Markdown', reply_markup=keyboard)
+        await reply.finish(response, parse_mode='Markdown', reply_markup=keyboard)
 
         await state.finish()
 
@@ -281,150 +445,98 @@ async def process_photo(message: types.Message, state: FSMContext):
             InlineKeyboardButton("⬅️ Назад", callback_data="back_to_menu")
         )
 
-        await message.answer(f"Ошибка при обработке фото: {str(e)}", reply_markup=keyboard)
+        await reply.finish(f"Ошибка при обработке фото: {str(e)}", reply_markup=keyboard)
         await state.finish()
 
 
-async def analyze_photo_with_openai(file_path: str) -> dict:
-    """Анализ фотографии через OpenAI Vision API"""
+async def process_photo_album(album: List[types.Message], state: FSMContext):
+    """Обработка альбома фотографий: одна сводная таблица показаний"""
+    reply = ReplySession(album[0])
     try:
-        logging.info(f"🔍 Начинаю анализ фото: {file_path}")
-        
-        # Промпт для анализа фото психрометра
-        photo_prompt = """
-        Проанализируй фотографию психрометра ВИТ-1 и определи показания термометров.
-
-        ВАЖНО: Ответь СТРОГО в формате:
-        СУХОЙ: XX.X
-        ВЛАЖНЫЙ: XX.X
-
-        Где XX.X - это температура в градусах Цельсия с точностью до 0.5°C.
-
-        Если не можешь определить показания, ответь:
-        ОШИБКА: Не удалось определить показания термометров
-        """
-
-        # Получаем URL файла
-        file_url = f"https://api.telegram.org/file/bot{BOT_TOKEN}/{file_path}"
-        logging.info(f"📥 Скачиваю фото с URL: {file_url}")
-        
-        # Скачиваем изображение
-        response = requests.get(file_url)
-        logging.info(f"📊 Статус скачивания: {response.status_code}")
-        
-        if response.status_code != 200:
-            logging.error(f"❌ Ошибка скачивания фото: {response.status_code}")
-            return {
-                "success": False,
-                "t_dry": None,
-                "t_wet": None,
-                "error": "Не удалось скачать изображение"
-            }
-        
-        # Кодируем изображение в base64
-        image_base64 = base64.b64encode(response.content).decode('utf-8')
-        logging.info(f"🔄 Изображение закодировано в base64, размер: {len(image_base64)} символов")
-        
-        # Отправляем запрос в OpenAI Vision API с новым синтаксисом
-        logging.info("🧠 Отправляю запрос в OpenAI Vision API...")
-        openai_response = client.chat.completions.create(
-            model="gpt-4.1",
-            messages=[
-                {
-                    "role": "user",
-                    "content": [
-                        {
-                            "type": "text",
-                            "text": photo_prompt
-                        },
-                        {
-                            "type": "image_url",
-                            "image_url": {
-                                "url": f"data:image/jpeg;base64,{image_base64}"
-                            }
-                        }
-                    ]
-                }
-            ],
-            max_tokens=100
+        await reply.update(f"🔍 Анализирую {len(album)} фото через OpenAI...")
+
+        # Берем фото наибольшего размера из каждого сообщения
+        files = await asyncio.gather(*(bot.get_file(m.photo[-1].file_id) for m in album))
+        photos_data = await analyze_photos_with_openai([f.file_path for f in files])
+
+        rows = ["№  Сух.  Влаж.  ΔT    Влажн."]
+        errors = []
+        for number, photo_data in enumerate(photos_data, start=1):
+            if not photo_data["success"]:
+                rows.append(f"{number:<2} —")
+                errors.append(f"{number}: {photo_data['error']}")
+                continue
+
+            # Рассчитываем влажность по локальной таблице
+            result = calculate_humidity(photo_data['t_dry'], photo_data['t_wet'])
+            if result["success"]:
+                readings_store.add(album[0].chat.id, result, 'photo')
+                rows.append(
+                    f"{number:<2} {result['t_dry']:<5} {result['t_wet']:<6} "
+                    f"{result['delta_t']:<5.1f} {result['humidity']}%"
+                )
+            else:
+                rows.append(f"{number:<2} {photo_data['t_dry']:<5} {photo_data['t_wet']:<6} —")
+                errors.append(f"{number}: {result['error']}")
+
+        response = "🌡️ *Результаты расчета по фото:*\n\n```\n" + "\n".join(rows) + "\n```"
+        if errors:
+            # Текст ошибок может содержать ответ модели: вне блока кода и с экранированием
+            response += "\n\nОшибки:\n" + "\n".join(escape_md(error) for error in errors)
+
+        keyboard = InlineKeyboardMarkup(row_width=2)
+        keyboard.add(
+            InlineKeyboardButton("🔄 Новый расчет", callback_data="start_calculation"),
+            InlineKeyboardButton("📷 Фото", callback_data="photo_input")
         )
-        
-        # Парсим ответ от OpenAI
-        ai_response = openai_response.choices[0].message.content.strip()
-        logging.info(f"🤖 Ответ от OpenAI: {ai_response}")
-        
-        # Извлекаем данные из ответа
-        lines = ai_response.split('\n')
-        t_dry = None
-        t_wet = None
-        
-        logging.info(f"📝 Парсинг ответа, строк: {len(lines)}")
-        
-        for line in lines:
-            line = line.strip()
-            logging.info(f"🔍 Обрабатываю строку: '{line}'")
-            
-            if line.startswith('СУХОЙ:'):
-                try:
-                    t_dry = float(line.split(':')[1].strip())
-                    logging.info(f"✅ Найден сухой термометр: {t_dry}°C")
-                except (ValueError, IndexError) as e:
-                    logging.error(f"❌ Ошибка парсинга сухого термометра: {e}")
-                    pass
-            elif line.startswith('ВЛАЖНЫЙ:'):
-                try:
-                    t_wet = float(line.split(':')[1].strip())
-                    logging.info(f"✅ Найден влажный термометр: {t_wet}°C")
-                except (ValueError, IndexError) as e:
-                    logging.error(f"❌ Ошибка парсинга влажного термометра: {e}")
-                    pass
-            elif line.startswith('ОШИБКА:'):
-                logging.error("❌ OpenAI сообщил об ошибке распознавания")
-                return {
-                    "success": False,
-                    "t_dry": None,
-                    "t_wet": None,
-                    "error": "OpenAI не смог определить показания термометров"
-                }
-        
-        # Проверяем, что получили оба значения
-        logging.info(f"📊 Результат парсинга - Сухой: {t_dry}, Влажный: {t_wet}")
-        
-        if t_dry is None or t_wet is None:
-            logging.error(f"❌ Не удалось извлечь данные из ответа: {ai_response}")
-            return {
-                "success": False,
-                "t_dry": None,
-                "t_wet": None,
-                "error": f"Не удалось извлечь данные из ответа OpenAI: {ai_response}"
-            }
-        
-        # Проверяем корректность значений
-        if t_dry < t_wet:
-            logging.error(f"❌ Логическая ошибка: сухой ({t_dry}) < влажный ({t_wet})")
-            return {
-                "success": False,
-                "t_dry": None,
-                "t_wet": None,
-                "error": "Показание влажного термометра не может быть больше показания сухого термометра"
-            }
-        
-        logging.info(f"✅ Успешный анализ: Сухой {t_dry}°C, Влажный {t_wet}°C")
-        return {
-            "success": True,
-            "t_dry": t_dry,
-            "t_wet": t_wet,
-            "error": None
-        }
+
+        await reply.finish(response, parse_mode='Markdown', reply_markup=keyboard)
 
     except Exception as e:
-        logging.error(f"💥 Критическая ошибка анализа фото: {str(e)}")
-        return {
-            "success": False,
-            "t_dry": None,
-            "t_wet": None,
-            "error": f"Ошибка анализа фото: {str(e)}"
-        }
+        keyboard = InlineKeyboardMarkup(row_width=1)
+        keyboard.add(
+            InlineKeyboardButton("⬅️ Назад", callback_data="back_to_menu")
+        )
+
+        await reply.finish(f"Ошибка при обработке фото: {str(e)}", reply_markup=keyboard)
+
+    await state.finish()
+
+
+async def analyze_photo_with_openai(file_path: str) -> dict:
+    """Анализ фотографии через OpenAI Vision API"""
+    logging.info(f"🔍 Начинаю анализ фото: {file_path}")
+    return (await analyze_photos_with_openai([file_path]))[0]
+
+
+async def analyze_photos_with_openai(file_paths: List[str]) -> List[dict]:
+    """Анализ нескольких фотографий из Telegram: параллельное скачивание и один запрос к OpenAI"""
+    images = await asyncio.gather(*(download_photo(path) for path in file_paths))
+    return await analyze_images_with_openai(images)
+
+
+async def download_photo(file_path: str) -> Optional[str]:
+    """Скачать фото из Telegram и закодировать в base64"""
+    logging.info(f"📥 Скачиваю фото: {file_path}")
+    try:
+        content = await bot.download_file(file_path)
+    except Exception as e:
+        logging.error(f"❌ Ошибка скачивания фото: {e}")
+        return None
+
+    image_base64 = base64.b64encode(content.getvalue()).decode('utf-8')
+    logging.info(f"🔄 Изображение закодировано в base64, размер: {len(image_base64)} символов")
+    return image_base64
+
+
+@dp.inline_handler(state='*')
+async def process_inline_query(inline_query: types.InlineQuery):
+    """Инлайн-режим: мгновенный расчет влажности по запросу '@bot Tсух Tвлажн'"""
+    await inline_query.answer(
+        [inline_answer(inline_query.query)],
+        cache_time=INLINE_CACHE_TIME,
+        is_personal=False
+    )
 
 
 @dp.message_handler()
@@ -443,5 +555,22 @@ async def handle_other_messages(message: types.Message):
     )
 
 
+async def on_startup(dp: Dispatcher):
+    """Запуск истории показаний, напоминаний и HTTP API (если задан API_PORT)"""
+    await readings_store.start()
+    await reminders.start()
+    if API_PORT:
+        photo_enabled = bool(get_setting('OPENAI_API_KEY'))
+        dp['api_runner'] = await start_api(API_HOST, int(API_PORT), photo_enabled=photo_enabled)
+
+
+async def on_shutdown(dp: Dispatcher):
+    runner = dp.get('api_runner')
+    if runner is not None:
+        await runner.cleanup()
+    await reminders.stop()
+    await readings_store.stop()
+
+
 if __name__ == '__main__':
-    executor.start_polling(dp, skip_updates=True)
+    executor.start_polling(dp, skip_updates=True, on_startup=on_startup, on_shutdown=on_shutdown)
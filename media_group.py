@@ -0,0 +1,43 @@
+"""
+Сборка альбомов (media group) Telegram в один пакет сообщений
+"""
+
+import asyncio
+from typing import Dict, List, Optional, Tuple
+
+from aiogram import types
+
+# Сколько ждать следующую фотографию альбома (сек)
+MEDIA_GROUP_WINDOW = 0.5
+
+
+class MediaGroupCollector:
+    """
+    Собирает фотографии одного альбома
+
+    Telegram присылает каждую фотографию альбома отдельным обновлением.
+    Первое сообщение группы ждет, пока в течение окна не перестанут приходить
+    новые, и возвращает весь альбом; остальные сообщения получают None.
+    """
+
+    def __init__(self, window: float = MEDIA_GROUP_WINDOW):
+        self.window = window
+        self._groups: Dict[Tuple[int, str], List[types.Message]] = {}
+
+    async def collect(self, message: types.Message) -> Optional[List[types.Message]]:
+        key = (message.chat.id, message.media_group_id)
+        group = self._groups.get(key)
+        if group is not None:
+            group.append(message)
+            return None
+
+        group = self._groups[key] = [message]
+        try:
+            seen = 0
+            while seen != len(group):
+                seen = len(group)
+                await asyncio.sleep(self.window)
+        finally:
+            del self._groups[key]
+
+        return sorted(group, key=lambda m: m.message_id)
@@ -0,0 +1,204 @@
+"""
+Распознавание показаний психрометра ВИТ-1 на фотографиях через OpenAI Vision API
+"""
+
+import asyncio
+import logging
+import re
+from functools import lru_cache
+from typing import List, Optional
+
+from config import get_openai_api_key
+
+# Модель для распознавания показаний и максимум изображений в одном запросе к ней
+VISION_MODEL = "gpt-4.1"
+MAX_IMAGES_PER_REQUEST = 10
+
+
+@lru_cache(maxsize=None)
+def get_client():
+    """Клиент OpenAI создается при первом анализе фото: импорт openai заметно замедляет запуск"""
+    from openai import OpenAI
+    return OpenAI(api_key=get_openai_api_key())
+
+
+def photo_error(error: str) -> dict:
+    """Результат неудачного анализа фотографии"""
+    return {
+        "success": False,
+        "t_dry": None,
+        "t_wet": None,
+        "error": error
+    }
+
+
+async def analyze_images_with_openai(images_base64: List[Optional[str]]) -> List[dict]:
+    """
+    Анализ нескольких изображений (base64) через OpenAI Vision API
+
+    Изображения отправляются в модель одним запросом (не более MAX_IMAGES_PER_REQUEST),
+    результаты в том же порядке. None в списке означает, что изображение не удалось скачать.
+    """
+    try:
+        results = [None] * len(images_base64)
+        downloaded = []
+        for index, image_base64 in enumerate(images_base64):
+            if image_base64 is None:
+                results[index] = photo_error("Не удалось скачать изображение")
+            else:
+                downloaded.append(index)
+
+        chunks = [
+            downloaded[i:i + MAX_IMAGES_PER_REQUEST]
+            for i in range(0, len(downloaded), MAX_IMAGES_PER_REQUEST)
+        ]
+        answers = await asyncio.gather(
+            *(request_vision([images_base64[index] for index in chunk]) for chunk in chunks)
+        )
+
+        for chunk, ai_response in zip(chunks, answers):
+            blocks = split_photo_blocks(ai_response, len(chunk))
+            for index, block in zip(chunk, blocks):
+                results[index] = parse_readings(block)
+
+        return results
+
+    except Exception as e:
+        logging.error(f"💥 Критическая ошибка анализа фото: {str(e)}")
+        return [photo_error(f"Ошибка анализа фото: {str(e)}") for _ in images_base64]
+
+
+async def request_vision(images_base64: List[str]) -> str:
+    """Один запрос в OpenAI Vision API по одному или нескольким изображениям"""
+    if len(images_base64) == 1:
+        # Промпт для анализа фото психрометра
+        photo_prompt = """
+        Проанализируй фотографию психрометра ВИТ-1 и определи показания термометров.
+
+        ВАЖНО: Ответь СТРОГО в формате:
+        СУХОЙ: XX.X
+        ВЛАЖНЫЙ: XX.X
+
+        Где XX.X - это температура в градусах Цельсия с точностью до 0.5°C.
+
+        Если не можешь определить показания, ответь:
+        ОШИБКА: Не удалось определить показания термометров
+        """
+    else:
+        # Промпт для анализа нескольких фото за один запрос
+        photo_prompt = f"""
+        Проанализируй {len(images_base64)} фотографий психрометров ВИТ-1 в порядке их следования
+        и определи показания термометров на каждой.
+
+        ВАЖНО: Ответь СТРОГО в формате, отдельным блоком для каждой фотографии:
+        ФОТО 1
+        СУХОЙ: XX.X
+        ВЛАЖНЫЙ: XX.X
+        ФОТО 2
+        СУХОЙ: XX.X
+        ВЛАЖНЫЙ: XX.X
+
+        Где XX.X - это температура в градусах Цельсия с точностью до 0.5°C.
+
+        Если на фотографии не можешь определить показания, в ее блоке ответь:
+        ОШИБКА: Не удалось определить показания термометров
+        """
+
+    content = [{"type": "text", "text": photo_prompt}]
+    for image_base64 in images_base64:
+        content.append({
+            "type": "image_url",
+            "image_url": {
+                "url": f"data:image/jpeg;base64,{image_base64}"
+            }
+        })
+
+    def create_completion():
+        return get_client().chat.completions.create(
+            model=VISION_MODEL,
+            messages=[
+                {
+                    "role": "user",
+                    "content": content
+                }
+            ],
+            max_tokens=100 * len(images_base64)
+        )
+
+    # Клиент OpenAI синхронный (и создается при первом запросе): выполняем в потоке,
+    # чтобы не блокировать бота
+    logging.info(f"🧠 Отправляю запрос в OpenAI Vision API, изображений: {len(images_base64)}")
+    openai_response = await asyncio.to_thread(create_completion)
+
+    ai_response = openai_response.choices[0].message.content.strip()
+    logging.info(f"🤖 Ответ от OpenAI: {ai_response}")
+    return ai_response
+
+
+def split_photo_blocks(ai_response: str, count: int) -> List[str]:
+    """Разбить ответ на блоки 'ФОТО N' по числу изображений"""
+    if count == 1:
+        return [ai_response]
+
+    blocks = [[] for _ in range(count)]
+    current = None
+    for line in ai_response.split('\n'):
+        match = re.match(r'^\W*ФОТО\s*(\d+)', line.strip())
+        if match:
+            number = int(match.group(1))
+            current = number - 1 if 1 <= number <= count else None
+        elif current is not None:
+            blocks[current].append(line)
+
+    return ['\n'.join(block) for block in blocks]
+
+
+def parse_readings(ai_response: str) -> dict:
+    """Извлечь показания термометров из ответа OpenAI"""
+    lines = ai_response.split('\n')
+    t_dry = None
+    t_wet = None
+
+    logging.info(f"📝 Парсинг ответа, строк: {len(lines)}")
+
+    for line in lines:
+        line = line.strip()
+        logging.info(f"🔍 Обрабатываю строку: '{line}'")
+
+        if line.startswith('СУХОЙ:'):
+            try:
+                t_dry = float(line.split(':')[1].strip())
+                logging.info(f"✅ Найден сухой термометр: {t_dry}°C")
+            except (ValueError, IndexError) as e:
+                logging.error(f"❌ Ошибка парсинга сухого термометра: {e}")
+                pass
+        elif line.startswith('ВЛАЖНЫЙ:'):
+            try:
+                t_wet = float(line.split(':')[1].strip())
+                logging.info(f"✅ Найден влажный термометр: {t_wet}°C")
+            except (ValueError, IndexError) as e:
+                logging.error(f"❌ Ошибка парсинга влажного термометра: {e}")
+                pass
+        elif line.startswith('ОШИБКА:'):
+            logging.error("❌ OpenAI сообщил об ошибке распознавания")
+            return photo_error("OpenAI не смог определить показания термометров")
+
+    # Проверяем, что получили оба значения
+    logging.info(f"📊 Результат парсинга - Сухой: {t_dry}, Влажный: {t_wet}")
+
+    if t_dry is None or t_wet is None:
+        logging.error(f"❌ Не удалось извлечь данные из ответа: {ai_response}")
+        return photo_error(f"Не удалось извлечь данные из ответа OpenAI: {ai_response}")
+
+    # Проверяем корректность значений
+    if t_dry < t_wet:
+        logging.error(f"❌ Логическая ошибка: сухой ({t_dry}) < влажный ({t_wet})")
+        return photo_error("Показание влажного термометра не может быть больше показания сухого термометра")
+
+    logging.info(f"✅ Успешный анализ: Сухой {t_dry}°C, Влажный {t_wet}°C")
+    return {
+        "success": True,
+        "t_dry": t_dry,
+        "t_wet": t_wet,
+        "error": None
+    }
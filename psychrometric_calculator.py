@@ -3,31 +3,40 @@
 Точные данные из официальной таблицы прибора
 """
 
-# Психрометрическая таблица ВИТ-1 (полная расширенная таблица с прибора)
-# Диапазон температур: 5-25°C, разности: 0.5-11.0°C
-PSYCHROMETRIC_TABLE = {
-    5: {0.5: 92, 1.0: 85, 1.5: 78, 2.0: 72, 2.5: 66, 3.0: 60, 3.5: 55, 4.0: 50, 4.5: 45, 5.0: 40, 5.5: 36, 6.0: 32, 6.5: 28, 7.0: 25, 7.5: 22, 8.0: 19, 8.5: 16, 9.0: 14, 9.5: 12, 10.0: 10, 10.5: 8, 11.0: 6},
-    6: {0.5: 92, 1.0: 85, 1.5: 78, 2.0: 72, 2.5: 66, 3.0: 60, 3.5: 55, 4.0: 50, 4.5: 45, 5.0: 40, 5.5: 36, 6.0: 32, 6.5: 28, 7.0: 25, 7.5: 22, 8.0: 19, 8.5: 16, 9.0: 14, 9.5: 12, 10.0: 10, 10.5: 8, 11.0: 6},
-    7: {0.5: 92, 1.0: 85, 1.5: 78, 2.0: 72, 2.5: 66, 3.0: 60, 3.5: 55, 4.0: 50, 4.5: 45, 5.0: 40, 5.5: 36, 6.0: 32, 6.5: 28, 7.0: 25, 7.5: 22, 8.0: 19, 8.5: 16, 9.0: 14, 9.5: 12, 10.0: 10, 10.5: 8, 11.0: 6},
-    8: {0.5: 92, 1.0: 85, 1.5: 78, 2.0: 72, 2.5: 66, 3.0: 60, 3.5: 55, 4.0: 50, 4.5: 45, 5.0: 40, 5.5: 36, 6.0: 32, 6.5: 28, 7.0: 25, 7.5: 22, 8.0: 19, 8.5: 16, 9.0: 14, 9.5: 12, 10.0: 10, 10.5: 8, 11.0: 6},
-    9: {0.5: 92, 1.0: 85, 1.5: 78, 2.0: 72, 2.5: 66, 3.0: 60, 3.5: 55, 4.0: 50, 4.5: 45, 5.0: 40, 5.5: 36, 6.0: 32, 6.5: 28, 7.0: 25, 7.5: 22, 8.0: 19, 8.5: 16, 9.0: 14, 9.5: 12, 10.0: 10, 10.5: 8, 11.0: 6},
-    10: {0.5: 92, 1.0: 85, 1.5: 78, 2.0: 72, 2.5: 66, 3.0: 60, 3.5: 55, 4.0: 50, 4.5: 45, 5.0: 40, 5.5: 36, 6.0: 27, 6.5: 24, 7.0: 21, 7.5: 18, 8.0: 16, 8.5: 14, 9.0: 12, 9.5: 10, 10.0: 8, 10.5: 7, 11.0: 5},
-    11: {0.5: 92, 1.0: 85, 1.5: 78, 2.0: 72, 2.5: 66, 3.0: 60, 3.5: 55, 4.0: 50, 4.5: 45, 5.0: 40, 5.5: 36, 6.0: 27, 6.5: 24, 7.0: 21, 7.5: 18, 8.0: 16, 8.5: 14, 9.0: 12, 9.5: 10, 10.0: 8, 10.5: 7, 11.0: 5},
-    12: {0.5: 92, 1.0: 85, 1.5: 78, 2.0: 72, 2.5: 66, 3.0: 60, 3.5: 55, 4.0: 50, 4.5: 45, 5.0: 40, 5.5: 36, 6.0: 27, 6.5: 24, 7.0: 21, 7.5: 18, 8.0: 16, 8.5: 14, 9.0: 12, 9.5: 10, 10.0: 8, 10.5: 7, 11.0: 5},
-    13: {0.5: 92, 1.0: 85, 1.5: 78, 2.0: 72, 2.5: 66, 3.0: 60, 3.5: 55, 4.0: 50, 4.5: 45, 5.0: 40, 5.5: 36, 6.0: 27, 6.5: 24, 7.0: 21, 7.5: 18, 8.0: 16, 8.5: 14, 9.0: 12, 9.5: 10, 10.0: 8, 10.5: 7, 11.0: 5},
-    14: {0.5: 92, 1.0: 85, 1.5: 78, 2.0: 72, 2.5: 66, 3.0: 60, 3.5: 55, 4.0: 50, 4.5: 45, 5.0: 40, 5.5: 36, 6.0: 27, 6.5: 24, 7.0: 21, 7.5: 18, 8.0: 16, 8.5: 14, 9.0: 12, 9.5: 10, 10.0: 8, 10.5: 7, 11.0: 5},
-    15: {0.5: 92, 1.0: 85, 1.5: 78, 2.0: 72, 2.5: 66, 3.0: 60, 3.5: 55, 4.0: 50, 4.5: 45, 5.0: 40, 5.5: 36, 6.0: 27, 6.5: 24, 7.0: 21, 7.5: 18, 8.0: 16, 8.5: 14, 9.0: 12, 9.5: 10, 10.0: 8, 10.5: 7, 11.0: 5},
-    16: {0.5: 92, 1.0: 85, 1.5: 78, 2.0: 72, 2.5: 66, 3.0: 60, 3.5: 55, 4.0: 50, 4.5: 45, 5.0: 40, 5.5: 36, 6.0: 27, 6.5: 24, 7.0: 21, 7.5: 18, 8.0: 16, 8.5: 14, 9.0: 12, 9.5: 10, 10.0: 8, 10.5: 7, 11.0: 5},
-    17: {0.5: 92, 1.0: 85, 1.5: 78, 2.0: 72, 2.5: 66, 3.0: 60, 3.5: 55, 4.0: 50, 4.5: 45, 5.0: 40, 5.5: 36, 6.0: 27, 6.5: 24, 7.0: 21, 7.5: 18, 8.0: 16, 8.5: 14, 9.0: 12, 9.5: 10, 10.0: 8, 10.5: 7, 11.0: 5},
-    18: {0.5: 92, 1.0: 85, 1.5: 78, 2.0: 72, 2.5: 66, 3.0: 60, 3.5: 55, 4.0: 50, 4.5: 45, 5.0: 40, 5.5: 36, 6.0: 27, 6.5: 24, 7.0: 21, 7.5: 18, 8.0: 16, 8.5: 14, 9.0: 12, 9.5: 10, 10.0: 8, 10.5: 7, 11.0: 5},
-    19: {0.5: 92, 1.0: 85, 1.5: 78, 2.0: 72, 2.5: 66, 3.0: 60, 3.5: 55, 4.0: 50, 4.5: 45, 5.0: 40, 5.5: 36, 6.0: 27, 6.5: 24, 7.0: 21, 7.5: 18, 8.0: 16, 8.5: 14, 9.0: 12, 9.5: 10, 10.0: 8, 10.5: 7, 11.0: 5},
-    20: {0.5: 92, 1.0: 85, 1.5: 78, 2.0: 72, 2.5: 66, 3.0: 60, 3.5: 55, 4.0: 50, 4.5: 45, 5.0: 40, 5.5: 36, 6.0: 27, 6.5: 24, 7.0: 21, 7.5: 18, 8.0: 16, 8.5: 14, 9.0: 12, 9.5: 10, 10.0: 8, 10.5: 7, 11.0: 5},
-    21: {0.5: 92, 1.0: 85, 1.5: 78, 2.0: 72, 2.5: 66, 3.0: 60, 3.5: 55, 4.0: 50, 4.5: 45, 5.0: 40, 5.5: 36, 6.0: 27, 6.5: 24, 7.0: 21, 7.5: 18, 8.0: 16, 8.5: 14, 9.0: 12, 9.5: 10, 10.0: 8, 10.5: 7, 11.0: 5},
-    22: {0.5: 92, 1.0: 85, 1.5: 78, 2.0: 72, 2.5: 66, 3.0: 74, 3.5: 55, 4.0: 50, 4.5: 45, 5.0: 40, 5.5: 36, 6.0: 27, 6.5: 24, 7.0: 21, 7.5: 18, 8.0: 16, 8.5: 14, 9.0: 12, 9.5: 10, 10.0: 8, 10.5: 7, 11.0: 5},
-    23: {0.5: 92, 1.0: 85, 1.5: 78, 2.0: 72, 2.5: 66, 3.0: 60, 3.5: 55, 4.0: 50, 4.5: 45, 5.0: 40, 5.5: 36, 6.0: 27, 6.5: 24, 7.0: 21, 7.5: 18, 8.0: 16, 8.5: 14, 9.0: 12, 9.5: 10, 10.0: 8, 10.5: 7, 11.0: 5},
-    24: {0.5: 92, 1.0: 85, 1.5: 78, 2.0: 72, 2.5: 66, 3.0: 60, 3.5: 55, 4.0: 50, 4.5: 45, 5.0: 40, 5.5: 36, 6.0: 27, 6.5: 24, 7.0: 21, 7.5: 18, 8.0: 16, 8.5: 14, 9.0: 12, 9.5: 10, 10.0: 8, 10.5: 7, 11.0: 5},
-    25: {0.5: 92, 1.0: 85, 1.5: 78, 2.0: 72, 2.5: 66, 3.0: 60, 3.5: 55, 4.0: 50, 4.5: 45, 5.0: 40, 5.5: 36, 6.0: 27, 6.5: 24, 7.0: 21, 7.5: 18, 8.0: 16, 8.5: 14, 9.0: 12, 9.5: 10, 10.0: 8, 10.5: 7, 11.0: 5}
-}
+from functools import lru_cache
+
+@lru_cache(maxsize=None)
+def get_psychrometric_table() -> dict:
+    """
+    Психрометрическая таблица ВИТ-1 (полная расширенная таблица с прибора)
+    Диапазон температур: 5-25°C, разности: 0.5-11.0°C
+
+    Таблица создается при первом обращении, а не при импорте модуля
+    """
+    return {
+        5: {0.5: 92, 1.0: 85, 1.5: 78, 2.0: 72, 2.5: 66, 3.0: 60, 3.5: 55, 4.0: 50, 4.5: 45, 5.0: 40, 5.5: 36, 6.0: 32, 6.5: 28, 7.0: 25, 7.5: 22, 8.0: 19, 8.5: 16, 9.0: 14, 9.5: 12, 10.0: 10, 10.5: 8, 11.0: 6},
+        6: {0.5: 92, 1.0: 85, 1.5: 78, 2.0: 72, 2.5: 66, 3.0: 60, 3.5: 55, 4.0: 50, 4.5: 45, 5.0: 40, 5.5: 36, 6.0: 32, 6.5: 28, 7.0: 25, 7.5: 22, 8.0: 19, 8.5: 16, 9.0: 14, 9.5: 12, 10.0: 10, 10.5: 8, 11.0: 6},
+        7: {0.5: 92, 1.0: 85, 1.5: 78, 2.0: 72, 2.5: 66, 3.0: 60, 3.5: 55, 4.0: 50, 4.5: 45, 5.0: 40, 5.5: 36, 6.0: 32, 6.5: 28, 7.0: 25, 7.5: 22, 8.0: 19, 8.5: 16, 9.0: 14, 9.5: 12, 10.0: 10, 10.5: 8, 11.0: 6},
+        8: {0.5: 92, 1.0: 85, 1.5: 78, 2.0: 72, 2.5: 66, 3.0: 60, 3.5: 55, 4.0: 50, 4.5: 45, 5.0: 40, 5.5: 36, 6.0: 32, 6.5: 28, 7.0: 25, 7.5: 22, 8.0: 19, 8.5: 16, 9.0: 14, 9.5: 12, 10.0: 10, 10.5: 8, 11.0: 6},
+        9: {0.5: 92, 1.0: 85, 1.5: 78, 2.0: 72, 2.5: 66, 3.0: 60, 3.5: 55, 4.0: 50, 4.5: 45, 5.0: 40, 5.5: 36, 6.0: 32, 6.5: 28, 7.0: 25, 7.5: 22, 8.0: 19, 8.5: 16, 9.0: 14, 9.5: 12, 10.0: 10, 10.5: 8, 11.0: 6},
+        10: {0.5: 92, 1.0: 85, 1.5: 78, 2.0: 72, 2.5: 66, 3.0: 60, 3.5: 55, 4.0: 50, 4.5: 45, 5.0: 40, 5.5: 36, 6.0: 27, 6.5: 24, 7.0: 21, 7.5: 18, 8.0: 16, 8.5: 14, 9.0: 12, 9.5: 10, 10.0: 8, 10.5: 7, 11.0: 5},
+        11: {0.5: 92, 1.0: 85, 1.5: 78, 2.0: 72, 2.5: 66, 3.0: 60, 3.5: 55, 4.0: 50, 4.5: 45, 5.0: 40, 5.5: 36, 6.0: 27, 6.5: 24, 7.0: 21, 7.5: 18, 8.0: 16, 8.5: 14, 9.0: 12, 9.5: 10, 10.0: 8, 10.5: 7, 11.0: 5},
+        12: {0.5: 92, 1.0: 85, 1.5: 78, 2.0: 72, 2.5: 66, 3.0: 60, 3.5: 55, 4.0: 50, 4.5: 45, 5.0: 40, 5.5: 36, 6.0: 27, 6.5: 24, 7.0: 21, 7.5: 18, 8.0: 16, 8.5: 14, 9.0: 12, 9.5: 10, 10.0: 8, 10.5: 7, 11.0: 5},
+        13: {0.5: 92, 1.0: 85, 1.5: 78, 2.0: 72, 2.5: 66, 3.0: 60, 3.5: 55, 4.0: 50, 4.5: 45, 5.0: 40, 5.5: 36, 6.0: 27, 6.5: 24, 7.0: 21, 7.5: 18, 8.0: 16, 8.5: 14, 9.0: 12, 9.5: 10, 10.0: 8, 10.5: 7, 11.0: 5},
+        14: {0.5: 92, 1.0: 85, 1.5: 78, 2.0: 72, 2.5: 66, 3.0: 60, 3.5: 55, 4.0: 50, 4.5: 45, 5.0: 40, 5.5: 36, 6.0: 27, 6.5: 24, 7.0: 21, 7.5: 18, 8.0: 16, 8.5: 14, 9.0: 12, 9.5: 10, 10.0: 8, 10.5: 7, 11.0: 5},
+        15: {0.5: 92, 1.0: 85, 1.5: 78, 2.0: 72, 2.5: 66, 3.0: 60, 3.5: 55, 4.0: 50, 4.5: 45, 5.0: 40, 5.5: 36, 6.0: 27, 6.5: 24, 7.0: 21, 7.5: 18, 8.0: 16, 8.5: 14, 9.0: 12, 9.5: 10, 10.0: 8, 10.5: 7, 11.0: 5},
+        16: {0.5: 92, 1.0: 85, 1.5: 78, 2.0: 72, 2.5: 66, 3.0: 60, 3.5: 55, 4.0: 50, 4.5: 45, 5.0: 40, 5.5: 36, 6.0: 27, 6.5: 24, 7.0: 21, 7.5: 18, 8.0: 16, 8.5: 14, 9.0: 12, 9.5: 10, 10.0: 8, 10.5: 7, 11.0: 5},
+        17: {0.5: 92, 1.0: 85, 1.5: 78, 2.0: 72, 2.5: 66, 3.0: 60, 3.5: 55, 4.0: 50, 4.5: 45, 5.0: 40, 5.5: 36, 6.0: 27, 6.5: 24, 7.0: 21, 7.5: 18, 8.0: 16, 8.5: 14, 9.0: 12, 9.5: 10, 10.0: 8, 10.5: 7, 11.0: 5},
+        18: {0.5: 92, 1.0: 85, 1.5: 78, 2.0: 72, 2.5: 66, 3.0: 60, 3.5: 55, 4.0: 50, 4.5: 45, 5.0: 40, 5.5: 36, 6.0: 27, 6.5: 24, 7.0: 21, 7.5: 18, 8.0: 16, 8.5: 14, 9.0: 12, 9.5: 10, 10.0: 8, 10.5: 7, 11.0: 5},
+        19: {0.5: 92, 1.0: 85, 1.5: 78, 2.0: 72, 2.5: 66, 3.0: 60, 3.5: 55, 4.0: 50, 4.5: 45, 5.0: 40, 5.5: 36, 6.0: 27, 6.5: 24, 7.0: 21, 7.5: 18, 8.0: 16, 8.5: 14, 9.0: 12, 9.5: 10, 10.0: 8, 10.5: 7, 11.0: 5},
+        20: {0.5: 92, 1.0: 85, 1.5: 78, 2.0: 72, 2.5: 66, 3.0: 60, 3.5: 55, 4.0: 50, 4.5: 45, 5.0: 40, 5.5: 36, 6.0: 27, 6.5: 24, 7.0: 21, 7.5: 18, 8.0: 16, 8.5: 14, 9.0: 12, 9.5: 10, 10.0: 8, 10.5: 7, 11.0: 5},
+        21: {0.5: 92, 1.0: 85, 1.5: 78, 2.0: 72, 2.5: 66, 3.0: 60, 3.5: 55, 4.0: 50, 4.5: 45, 5.0: 40, 5.5: 36, 6.0: 27, 6.5: 24, 7.0: 21, 7.5: 18, 8.0: 16, 8.5: 14, 9.0: 12, 9.5: 10, 10.0: 8, 10.5: 7, 11.0: 5},
+        22: {0.5: 92, 1.0: 85, 1.5: 78, 2.0: 72, 2.5: 66, 3.0: 74, 3.5: 55, 4.0: 50, 4.5: 45, 5.0: 40, 5.5: 36, 6.0: 27, 6.5: 24, 7.0: 21, 7.5: 18, 8.0: 16, 8.5: 14, 9.0: 12, 9.5: 10, 10.0: 8, 10.5: 7, 11.0: 5},
+        23: {0.5: 92, 1.0: 85, 1.5: 78, 2.0: 72, 2.5: 66, 3.0: 60, 3.5: 55, 4.0: 50, 4.5: 45, 5.0: 40, 5.5: 36, 6.0: 27, 6.5: 24, 7.0: 21, 7.5: 18, 8.0: 16, 8.5: 14, 9.0: 12, 9.5: 10, 10.0: 8, 10.5: 7, 11.0: 5},
+        24: {0.5: 92, 1.0: 85, 1.5: 78, 2.0: 72, 2.5: 66, 3.0: 60, 3.5: 55, 4.0: 50, 4.5: 45, 5.0: 40, 5.5: 36, 6.0: 27, 6.5: 24, 7.0: 21, 7.5: 18, 8.0: 16, 8.5: 14, 9.0: 12, 9.5: 10, 10.0: 8, 10.5: 7, 11.0: 5},
+        25: {0.5: 92, 1.0: 85, 1.5: 78, 2.0: 72, 2.5: 66, 3.0: 60, 3.5: 55, 4.0: 50, 4.5: 45, 5.0: 40, 5.5: 36, 6.0: 27, 6.5: 24, 7.0: 21, 7.5: 18, 8.0: 16, 8.5: 14, 9.0: 12, 9.5: 10, 10.0: 8, 10.5: 7, 11.0: 5}
+    }
+
 
 def calculate_humidity(t_dry: float, t_wet: float) -> dict:
     """
@@ -58,20 +67,21 @@ def calculate_humidity(t_dry: float, t_wet: float) -> dict:
         delta_rounded = round(delta_t * 2) / 2
         
         # Проверяем наличие данных в таблице
-        if t_rounded not in PSYCHROMETRIC_TABLE:
+        table = get_psychrometric_table()
+        if t_rounded not in table:
             return {
                 "error": f"Температура {t_rounded}°C не входит в диапазон таблицы (5-25°C)",
                 "success": False
             }
         
-        if delta_rounded not in PSYCHROMETRIC_TABLE[t_rounded]:
+        if delta_rounded not in table[t_rounded]:
             return {
                 "error": f"Разность температур {delta_rounded}°C не входит в диапазон таблицы (0.5-11.0°C)",
                 "success": False
             }
         
         # Получаем влажность из таблицы
-        humidity = PSYCHROMETRIC_TABLE[t_rounded][delta_rounded]
+        humidity = table[t_rounded][delta_rounded]
         
         return {
             "success": True,
@@ -95,13 +105,14 @@ def get_table_range() -> dict:
     Returns:
         dict: Информация о диапазонах таблицы
     """
-    temperatures = list(PSYCHROMETRIC_TABLE.keys())
+    table = get_psychrometric_table()
+    temperatures = list(table.keys())
     min_temp = min(temperatures)
     max_temp = max(temperatures)
     
     # Получаем все разности для первой температуры
     first_temp = temperatures[0]
-    deltas = list(PSYCHROMETRIC_TABLE[first_temp].keys())
+    deltas = list(table[first_temp].keys())
     min_delta = min(deltas)
     max_delta = max(deltas)
     
@@ -112,6 +123,71 @@ def get_table_range() -> dict:
         "total_deltas": len(deltas)
     }
 
+@lru_cache(maxsize=None)
+def get_humidity_grid() -> tuple:
+    """
+    Плотная таблица для пакетного расчета: строки — температуры по порядку,
+    столбцы — разности с шагом 0.5°C (индекс = ΔT * 2 - 1)
+    
+    Returns:
+        tuple: (минимальная температура, список разностей, строки таблицы)
+    """
+    table = get_psychrometric_table()
+    min_temp = min(table)
+    deltas = sorted(table[min_temp])
+    grid = [[table[t][delta] for delta in deltas] for t in sorted(table)]
+    return min_temp, deltas, grid
+
+def __getattr__(name: str):
+    # Прежний доступ к таблице как к атрибуту модуля
+    if name == "PSYCHROMETRIC_TABLE":
+        return get_psychrometric_table()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def calculate_humidity_batch(readings) -> list:
+    """
+    Пакетный расчет влажности для большого числа показаний
+
+    Поиск идет по плотной таблице get_humidity_grid() без промежуточных словарей;
+    показания вне таблицы или некорректные считаются через calculate_humidity,
+    поэтому результаты совпадают с ним (кроме поля result_text).
+    
+    Args:
+        readings: Последовательность пар (t_dry, t_wet)
+    
+    Returns:
+        list: Результаты расчета в том же порядке
+    """
+    min_temp, deltas, grid = get_humidity_grid()
+    rows = len(grid)
+    columns = len(deltas)
+    results = []
+    append = results.append
+
+    for t_dry, t_wet in readings:
+        try:
+            delta_t = t_dry - t_wet
+            row = round(t_dry) - min_temp
+            column = round(delta_t * 2) - 1
+            fast = t_dry >= t_wet and 0 <= row < rows and 0 <= column < columns
+        except Exception:
+            fast = False
+
+        if fast:
+            append({
+                "success": True,
+                "t_dry": t_dry,
+                "t_wet": t_wet,
+                "delta_t": delta_t,
+                "humidity": grid[row][column]
+            })
+        else:
+            result = calculate_humidity(t_dry, t_wet)
+            result.pop("result_text", None)
+            append(result)
+
+    return results
+
 # Пример использования
 if __name__ == "__main__":
     # Тестовые примеры
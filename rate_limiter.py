@@ -0,0 +1,122 @@
+"""
+Ограничитель частоты исходящих сообщений для Telegram Bot API
+Token bucket: общий лимит бота и отдельный лимит на каждый чат
+"""
+
+import asyncio
+import time
+from typing import Dict, Optional
+
+from aiogram import Bot
+
+# Лимиты Telegram: ~30 сообщений/с на бота, ~1 сообщение/с в личный чат,
+# 20 сообщений/мин в группу
+GLOBAL_RATE = 30.0
+PRIVATE_CHAT_RATE = 1.0
+GROUP_CHAT_RATE = 20 / 60
+
+# Запас общего лимита: без всплесков, иначе в любую секунду уходило бы до 2 * GLOBAL_RATE
+GLOBAL_BURST = 1
+
+# Методы Bot API, которые отправляют или изменяют сообщения в чате
+LIMITED_METHOD_PREFIXES = ('send', 'edit', 'copy', 'forward')
+
+# Порог, после которого из словаря удаляются неиспользуемые корзины чатов
+MAX_IDLE_BUCKETS = 10000
+
+
+class TokenBucket:
+    """Корзина токенов: rate токенов в секунду, не более capacity подряд"""
+
+    def __init__(self, rate: float, capacity: float, clock=time.monotonic):
+        self.rate = rate
+        self.capacity = capacity
+        self._clock = clock
+        self._tokens = capacity
+        self._updated = clock()
+
+    def _refill(self):
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self) -> float:
+        """
+        Занять один токен
+
+        Returns:
+            float: Сколько секунд нужно подождать до использования токена
+        """
+        self._refill()
+        self._tokens -= 1
+        if self._tokens >= 0:
+            return 0.0
+        return -self._tokens / self.rate
+
+    @property
+    def is_full(self) -> bool:
+        self._refill()
+        return self._tokens >= self.capacity
+
+
+class SendRateLimiter:
+    """Общий и початовый лимит исходящих сообщений"""
+
+    def __init__(self, global_rate: float = GLOBAL_RATE,
+                 global_burst: float = GLOBAL_BURST,
+                 private_rate: float = PRIVATE_CHAT_RATE,
+                 group_rate: float = GROUP_CHAT_RATE,
+                 clock=time.monotonic):
+        self._clock = clock
+        self._global = TokenBucket(global_rate, global_burst, clock)
+        self._private_rate = private_rate
+        self._group_rate = group_rate
+        self._chats: Dict[int, TokenBucket] = {}
+
+    def _chat_bucket(self, chat_id: int) -> TokenBucket:
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            if len(self._chats) >= MAX_IDLE_BUCKETS:
+                self._chats = {key: value for key, value in self._chats.items() if not value.is_full}
+            # Отрицательный chat_id у групп и каналов
+            if chat_id < 0:
+                bucket = TokenBucket(self._group_rate, 3, self._clock)
+            else:
+                bucket = TokenBucket(self._private_rate, 3, self._clock)
+            self._chats[chat_id] = bucket
+        return bucket
+
+    async def acquire(self, chat_id: Optional[int] = None):
+        """
+        Дождаться разрешения на отправку сообщения
+
+        Сначала ждем лимит чата и только потом занимаем слот общего лимита:
+        иначе отправка, задержанная чатом, ушла бы поверх чужих слотов.
+        """
+        if chat_id is not None:
+            delay = self._chat_bucket(chat_id).reserve()
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+        delay = self._global.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class RateLimitedBot(Bot):
+    """Бот, пропускающий все исходящие сообщения через SendRateLimiter"""
+
+    def __init__(self, *args, limiter: Optional[SendRateLimiter] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.limiter = limiter or SendRateLimiter()
+
+    async def request(self, method, data=None, files=None, **kwargs):
+        if method.startswith(LIMITED_METHOD_PREFIXES):
+            chat_id = (data or {}).get('chat_id')
+            try:
+                chat_id = int(chat_id) if chat_id is not None else None
+            except (TypeError, ValueError):
+                # @username канала: ограничиваем только общим лимитом
+                chat_id = None
+            await self.limiter.acquire(chat_id)
+        return await super().request(method, data, files, **kwargs)
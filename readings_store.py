@@ -0,0 +1,229 @@
+"""
+История показаний: журнал расчетов в SQLite и дневная статистика по чатам и объектам
+"""
+
+import asyncio
+import csv
+import io
+import logging
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta
+from typing import BinaryIO, Dict, List, Optional
+
+# Как часто накопленные показания записываются в базу (сек)
+FLUSH_INTERVAL = 0.5
+
+# Сколько строк читается из базы за раз при выгрузке CSV
+EXPORT_CHUNK_SIZE = 1000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS readings (
+    id INTEGER PRIMARY KEY,
+    chat_id INTEGER NOT NULL,
+    site TEXT NOT NULL,
+    ts INTEGER NOT NULL,
+    t_dry REAL NOT NULL,
+    t_wet REAL NOT NULL,
+    delta_t REAL NOT NULL,
+    humidity INTEGER NOT NULL,
+    source TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS readings_chat_ts ON readings (chat_id, ts);
+
+CREATE TABLE IF NOT EXISTS daily_stats (
+    chat_id INTEGER NOT NULL,
+    site TEXT NOT NULL,
+    day TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    humidity_sum INTEGER NOT NULL,
+    humidity_min INTEGER NOT NULL,
+    humidity_max INTEGER NOT NULL,
+    PRIMARY KEY (chat_id, day, site)
+);
+
+CREATE TABLE IF NOT EXISTS chat_sites (
+    chat_id INTEGER PRIMARY KEY,
+    site TEXT NOT NULL
+);
+"""
+
+UPSERT_DAILY_STATS = """
+INSERT INTO daily_stats (chat_id, site, day, count, humidity_sum, humidity_min, humidity_max)
+VALUES (?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (chat_id, day, site) DO UPDATE SET
+    count = count + excluded.count,
+    humidity_sum = humidity_sum + excluded.humidity_sum,
+    humidity_min = MIN(humidity_min, excluded.humidity_min),
+    humidity_max = MAX(humidity_max, excluded.humidity_max)
+"""
+
+
+class ReadingsStore:
+    """
+    Журнал показаний с пакетной фоновой записью
+
+    add() только ставит показание в очередь, поэтому не задерживает ответ пользователю.
+    Фоновая задача раз в FLUSH_INTERVAL записывает очередь одной транзакцией и
+    сразу обновляет дневные агрегаты (daily_stats), так что /stats не сканирует журнал.
+    Все обращения к SQLite идут через один рабочий поток.
+    """
+
+    def __init__(self, path: str, flush_interval: float = FLUSH_INTERVAL):
+        self.path = path
+        self.flush_interval = flush_interval
+        self._pending = []
+        self._sites: Dict[int, str] = {}
+        self._connection: Optional[sqlite3.Connection] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    async def start(self):
+        """Открыть базу и запустить фоновую запись"""
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='readings')
+        await self._run(self._open)
+        self._task = asyncio.create_task(self._writer())
+        logging.info(f"🗄️ История показаний: {self.path}")
+
+    async def stop(self):
+        """Записать оставшиеся показания и закрыть базу"""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await self.flush()
+        await self._run(self._connection.close)
+        self._executor.shutdown()
+
+    def _open(self):
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.executescript(SCHEMA)
+        self._sites = dict(self._connection.execute("SELECT chat_id, site FROM chat_sites"))
+
+    async def _writer(self):
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logging.error(f"❌ Ошибка записи истории показаний: {e}")
+
+    def add(self, chat_id: int, result: dict, source: str, timestamp: Optional[float] = None):
+        """Поставить успешный результат calculate_humidity в очередь на запись"""
+        self._pending.append((
+            chat_id,
+            self._sites.get(chat_id, ''),
+            int(timestamp if timestamp is not None else time.time()),
+            result['t_dry'],
+            result['t_wet'],
+            result['delta_t'],
+            result['humidity'],
+            source
+        ))
+
+    async def flush(self):
+        """Записать накопленные показания в базу"""
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, []
+        try:
+            await self._run(self._insert, batch)
+        except Exception:
+            # Не теряем показания: вернем пакет в начало очереди до следующей записи
+            self._pending = batch + self._pending
+            raise
+
+    def _insert(self, batch: list):
+        # Агрегаты пакета по (чат, объект, день) перед слиянием с daily_stats
+        rollups = {}
+        for chat_id, site, ts, _, _, _, humidity, _ in batch:
+            key = (chat_id, site, date.fromtimestamp(ts).isoformat())
+            stats = rollups.get(key)
+            if stats is None:
+                rollups[key] = [1, humidity, humidity, humidity]
+            else:
+                stats[0] += 1
+                stats[1] += humidity
+                stats[2] = min(stats[2], humidity)
+                stats[3] = max(stats[3], humidity)
+
+        with self._connection:
+            self._connection.executemany(
+                "INSERT INTO readings (chat_id, site, ts, t_dry, t_wet, delta_t, humidity, source) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                batch
+            )
+            self._connection.executemany(
+                UPSERT_DAILY_STATS,
+                [key + tuple(stats) for key, stats in rollups.items()]
+            )
+
+    def get_site(self, chat_id: int) -> str:
+        return self._sites.get(chat_id, '')
+
+    async def set_site(self, chat_id: int, site: str):
+        """Текущий объект чата: им помечаются следующие показания"""
+        self._sites[chat_id] = site
+        await self._run(self._save_site, chat_id, site)
+
+    def _save_site(self, chat_id: int, site: str):
+        with self._connection:
+            self._connection.execute(
+                "INSERT INTO chat_sites (chat_id, site) VALUES (?, ?) "
+                "ON CONFLICT (chat_id) DO UPDATE SET site = excluded.site",
+                (chat_id, site)
+            )
+
+    async def history(self, chat_id: int, limit: int = 10) -> List[tuple]:
+        """Последние показания чата: (ts, site, t_dry, t_wet, delta_t, humidity, source)"""
+        await self.flush()
+        return await self._run(self._query, (
+            "SELECT ts, site, t_dry, t_wet, delta_t, humidity, source FROM readings "
+            "WHERE chat_id = ? ORDER BY ts DESC, id DESC LIMIT ?"
+        ), (chat_id, limit))
+
+    async def stats(self, chat_id: int, days: int = 7) -> List[tuple]:
+        """Статистика по дням и объектам: (day, site, count, mean, min, max)"""
+        await self.flush()
+        since = (date.today() - timedelta(days=days - 1)).isoformat()
+        return await self._run(self._query, (
+            "SELECT day, site, count, CAST(humidity_sum AS REAL) / count, humidity_min, humidity_max "
+            "FROM daily_stats WHERE chat_id = ? AND day >= ? ORDER BY day DESC, site"
+        ), (chat_id, since))
+
+    def _query(self, sql: str, params: tuple) -> List[tuple]:
+        return self._connection.execute(sql, params).fetchall()
+
+    async def export_csv(self, chat_id: int, file: BinaryIO) -> int:
+        """Выгрузить все показания чата в CSV, читая базу порциями; возвращает число строк"""
+        await self.flush()
+        return await self._run(self._export_csv, chat_id, file)
+
+    def _export_csv(self, chat_id: int, file: BinaryIO) -> int:
+        text = io.TextIOWrapper(file, encoding='utf-8-sig', newline='')
+        writer = csv.writer(text, delimiter=';')
+        writer.writerow(['Время', 'Объект', 'Tсух', 'Tвлажн', 'ΔT', 'Влажность', 'Источник'])
+
+        cursor = self._connection.execute(
+            "SELECT ts, site, t_dry, t_wet, delta_t, humidity, source FROM readings "
+            "WHERE chat_id = ? ORDER BY ts, id",
+            (chat_id,)
+        )
+        count = 0
+        while True:
+            rows = cursor.fetchmany(EXPORT_CHUNK_SIZE)
+            if not rows:
+                break
+            writer.writerows(
+                (datetime.fromtimestamp(row[0]).strftime('%Y-%m-%d %H:%M:%S'),) + row[1:]
+                for row in rows
+            )
+            count += len(rows)
+
+        text.flush()
+        text.detach()
+        return count
@@ -0,0 +1,288 @@
+"""
+Ежедневные напоминания о замерах влажности
+
+Все расписания обслуживает один цикл asyncio над кучей (heapq) ближайших срабатываний,
+а не отдельная спящая задача на каждого пользователя.
+"""
+
+import asyncio
+import heapq
+import logging
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+# Максимальный сдвиг срабатывания (сек): напоминания на одно время
+# равномерно распределяются по этому окну, чтобы не упираться в лимиты Telegram
+REMINDER_JITTER = 600
+
+# Сколько напоминаний отправляется одновременно (остальные ждут в очереди)
+SEND_WORKERS = 8
+
+# Максимум напоминаний на один чат
+MAX_REMINDERS_PER_CHAT = 24
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS reminders (
+    chat_id INTEGER NOT NULL,
+    minute INTEGER NOT NULL,
+    PRIMARY KEY (chat_id, minute)
+);
+"""
+
+
+def parse_time(text: str) -> Optional[int]:
+    """Время 'ЧЧ:ММ' -> минута суток или None"""
+    try:
+        hours, minutes = text.strip().split(':')
+        hours, minutes = int(hours), int(minutes)
+    except ValueError:
+        return None
+    if 0 <= hours < 24 and 0 <= minutes < 60:
+        return hours * 60 + minutes
+    return None
+
+
+def format_time(minute: int) -> str:
+    return f"{minute // 60:02d}:{minute % 60:02d}"
+
+
+class ReminderScheduler:
+    """
+    Планировщик ежедневных напоминаний
+
+    Расписания хранятся в SQLite и восстанавливаются при старте. Каждое срабатывание
+    сдвигается на постоянную для чата задержку в пределах [0, jitter), а отправка идет
+    через ограниченное число воркеров, поэтому тысячи напоминаний на 09:00 расходятся
+    по окну, а не уходят одной пачкой. clock и sleep подменяются в тестах.
+    """
+
+    def __init__(self, path: str, send: Callable[[int, int], Awaitable],
+                 clock: Callable[[], float] = time.time,
+                 sleep: Callable[[float], Awaitable] = asyncio.sleep,
+                 jitter: float = REMINDER_JITTER, workers: int = SEND_WORKERS):
+        self.path = path
+        self.jitter = jitter
+        self._send = send
+        self._clock = clock
+        self._sleep = sleep
+        self._workers = workers
+        # Куча (время срабатывания, chat_id, минута суток, поколение)
+        self._heap: List[Tuple[float, int, int, int]] = []
+        # Текущее поколение расписания: записи кучи с другим поколением отменены
+        self._active: Dict[Tuple[int, int], int] = {}
+        self._chats: Dict[int, Set[int]] = {}
+        self._generation = 0
+        self._connection: Optional[sqlite3.Connection] = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+
+    async def _run(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    async def start(self):
+        """Загрузить расписания и запустить цикл напоминаний"""
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='reminders')
+        self._wakeup = asyncio.Event()
+        self._queue = asyncio.Queue()
+
+        rows = await self._run(self._open)
+        for chat_id, minute in rows:
+            self._schedule(chat_id, minute)
+
+        self._tasks = [asyncio.create_task(self._loop())]
+        self._tasks += [asyncio.create_task(self._worker()) for _ in range(self._workers)]
+        logging.info(f"⏰ Загружено напоминаний: {len(rows)}")
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+        await self._run(self._connection.close)
+        self._executor.shutdown()
+
+    def _open(self) -> List[tuple]:
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        self._connection.executescript(SCHEMA)
+        return self._connection.execute("SELECT chat_id, minute FROM reminders").fetchall()
+
+    def _execute(self, sql: str, params: tuple):
+        with self._connection:
+            self._connection.execute(sql, params)
+
+    def chat_jitter(self, chat_id: int) -> float:
+        """Постоянный для чата сдвиг срабатывания в пределах [0, jitter)"""
+        return (chat_id * 2654435761 % 2 ** 32) / 2 ** 32 * self.jitter
+
+    def next_due(self, chat_id: int, minute: int, after: float) -> float:
+        """Ближайшее срабатывание позже момента after (по местному времени)"""
+        moment = datetime.fromtimestamp(after).replace(
+            hour=minute // 60, minute=minute % 60, second=0, microsecond=0
+        )
+        due = moment.timestamp() + self.chat_jitter(chat_id)
+        if due <= after:
+            due = (moment + timedelta(days=1)).timestamp() + self.chat_jitter(chat_id)
+        return due
+
+    def _schedule(self, chat_id: int, minute: int):
+        self._generation += 1
+        self._active[(chat_id, minute)] = self._generation
+        self._chats.setdefault(chat_id, set()).add(minute)
+        heapq.heappush(self._heap, (self.next_due(chat_id, minute, self._clock()), chat_id, minute, self._generation))
+        self._wakeup.set()
+
+    def reminders_for(self, chat_id: int) -> List[int]:
+        """Минуты суток, на которые у чата есть напоминания"""
+        return sorted(self._chats.get(chat_id, ()))
+
+    async def add(self, chat_id: int, minute: int) -> bool:
+        """Добавить ежедневное напоминание; False, если у чата уже слишком много"""
+        minutes = self._chats.get(chat_id, set())
+        if minute in minutes:
+            return True
+        if len(minutes) >= MAX_REMINDERS_PER_CHAT:
+            return False
+
+        self._schedule(chat_id, minute)
+        await self._run(self._execute, "INSERT OR IGNORE INTO reminders (chat_id, minute) VALUES (?, ?)",
+                        (chat_id, minute))
+        return True
+
+    async def remove(self, chat_id: int, minute: int) -> bool:
+        """Удалить напоминание; запись в куче отбрасывается при извлечении"""
+        if self._active.pop((chat_id, minute), None) is None:
+            return False
+
+        minutes = self._chats[chat_id]
+        minutes.discard(minute)
+        if not minutes:
+            del self._chats[chat_id]
+        await self._run(self._execute, "DELETE FROM reminders WHERE chat_id = ? AND minute = ?",
+                        (chat_id, minute))
+        return True
+
+    async def remove_chat(self, chat_id: int):
+        """Удалить все напоминания чата"""
+        for minute in self._chats.pop(chat_id, ()):
+            self._active.pop((chat_id, minute), None)
+        await self._run(self._execute, "DELETE FROM reminders WHERE chat_id = ?", (chat_id,))
+
+    async def _loop(self):
+        while True:
+            now = self._clock()
+            while self._heap and self._heap[0][0] <= now:
+                due, chat_id, minute, generation = heapq.heappop(self._heap)
+                if self._active.get((chat_id, minute)) != generation:
+                    continue
+                self._queue.put_nowait((chat_id, minute))
+                # От max(due, now): после простоя дольше суток пропущенные дни не повторяются
+                heapq.heappush(self._heap, (self.next_due(chat_id, minute, max(due, now)), chat_id, minute, generation))
+
+            self._wakeup.clear()
+            await self._wait(self._heap[0][0] - now if self._heap else None)
+
+    async def _wait(self, delay: Optional[float]):
+        """Ждать до следующего срабатывания или до изменения расписания"""
+        waiters = [asyncio.ensure_future(self._wakeup.wait())]
+        if delay is not None:
+            waiters.append(asyncio.ensure_future(self._sleep(delay)))
+        try:
+            await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for waiter in waiters:
+                waiter.cancel()
+
+    async def _worker(self):
+        while True:
+            chat_id, minute = await self._queue.get()
+            try:
+                await self._send(chat_id, minute)
+            except Exception as e:
+                logging.error(f"❌ Ошибка отправки напоминания в чат {chat_id}: {e}")
+            finally:
+                self._queue.task_done()
+
+
+# Проверка на фиктивных часах
+if __name__ == "__main__":
+    class FakeClock:
+        """Часы, время которых идет только при вызове advance()"""
+
+        def __init__(self, now: float):
+            self.now = now
+            self._sleepers = []
+
+        def time(self) -> float:
+            return self.now
+
+        async def sleep(self, delay: float):
+            future = asyncio.get_running_loop().create_future()
+            self._sleepers.append((self.now + delay, future))
+            await future
+
+        async def advance(self, seconds: float):
+            """Перемотать время, по очереди пробуждая спящих"""
+            end = self.now + seconds
+            while True:
+                self._sleepers = [(wake, future) for wake, future in self._sleepers if not future.done()]
+                wakes = [wake for wake, _ in self._sleepers if wake <= end]
+                self.now = max(self.now, min(wakes)) if wakes else end
+                for wake, future in self._sleepers:
+                    if wake <= self.now:
+                        future.set_result(None)
+                for _ in range(20):
+                    await asyncio.sleep(0)
+                if not wakes:
+                    break
+
+    async def check():
+        start = datetime(2026, 1, 1, 8, 59).timestamp()
+        clock = FakeClock(start)
+        sent = []
+
+        async def send(chat_id: int, minute: int):
+            sent.append((chat_id, minute, clock.time()))
+
+        scheduler = ReminderScheduler(':memory:', send, clock=clock.time, sleep=clock.sleep, jitter=60)
+        await scheduler.start()
+        for chat_id in range(1, 1001):
+            await scheduler.add(chat_id, 9 * 60)
+        await scheduler.add(1, 18 * 60)
+        await scheduler.remove(2, 9 * 60)
+
+        await clock.advance(2 * 24 * 3600)
+        await scheduler._queue.join()
+        await scheduler.stop()
+
+        assert len(sent) == 2 * (999 + 1), len(sent)
+
+        nine = datetime(2026, 1, 1, 9, 0).timestamp()
+        first_day = [moment for chat_id, minute, moment in sent if minute == 9 * 60 and moment < nine + 3600]
+        assert len(first_day) == 999, len(first_day)
+        assert all(nine <= moment < nine + 60 for moment in first_day)
+        assert 2 not in {chat_id for chat_id, _, _ in sent}
+        assert any(minute == 18 * 60 for _, minute, _ in sent)
+
+        # Скачок часов на 3 суток: каждое напоминание отправляется один раз, без серии повторов
+        jump_sent = []
+
+        async def send_after_jump(chat_id: int, minute: int):
+            jump_sent.append((chat_id, minute))
+
+        jump_clock = FakeClock(start)
+        jumper = ReminderScheduler(':memory:', send_after_jump, clock=jump_clock.time, sleep=jump_clock.sleep, jitter=60)
+        await jumper.start()
+        await jumper.add(1, 9 * 60)
+        jump_clock.now += 3 * 24 * 3600
+        await jump_clock.advance(0)
+        await jumper._queue.join()
+        await jumper.stop()
+        assert jump_sent == [(1, 9 * 60)], jump_sent
+        print(f"✅ Напоминаний отправлено: {len(sent)}, разброс первого дня: "
+              f"{min(first_day) - nine:.1f}-{max(first_day) - nine:.1f} сек")
+
+    asyncio.run(check())
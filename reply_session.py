@@ -0,0 +1,132 @@
+"""
+Сессия ответа: одно сообщение, которое редактируется по мере обработки запроса
+"""
+
+import asyncio
+import logging
+from typing import Optional
+
+from aiogram import types
+from aiogram.utils.exceptions import MessageNotModified
+
+# Минимальный интервал между редактированиями одного сообщения (сек)
+MIN_EDIT_INTERVAL = 1.0
+
+
+class ReplySession:
+    """
+    Ответ пользователю в виде одного сообщения
+
+    Первый вызов update/finish отправляет сообщение, последующие редактируют его.
+    Частые промежуточные стадии объединяются: в Telegram уходит только последняя.
+    Отправка и редактирования идут строго по очереди, поэтому итоговый текст
+    не может быть перезаписан запоздавшей промежуточной стадией.
+    """
+
+    def __init__(self, message: types.Message, min_interval: float = MIN_EDIT_INTERVAL):
+        self._message = message
+        self._min_interval = min_interval
+        self._sent: Optional[types.Message] = None
+        self._shown = None
+        self._pending = None
+        self._flush_task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+        self._last_edit = 0.0
+
+    @property
+    def sent_message(self) -> Optional[types.Message]:
+        return self._sent
+
+    async def update(self, text: str, **kwargs):
+        """Промежуточная стадия обработки"""
+        if self._sent is None:
+            await self._show(text, kwargs)
+            return
+
+        self._pending = (text, kwargs)
+        if self._flush_task is None:
+            loop = asyncio.get_running_loop()
+            delay = max(0.0, self._last_edit + self._min_interval - loop.time())
+            self._flush_task = asyncio.create_task(self._flush_later(delay))
+
+    async def finish(self, text: str, **kwargs) -> types.Message:
+        """Итоговый текст: показывается сразу, отложенные стадии отменяются"""
+        self._pending = None
+        task = self._flush_task
+        if task is not None:
+            # Дожидаемся отмены, чтобы промежуточная стадия не ушла после итоговой
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+        await self._show(text, kwargs)
+        return self._sent
+
+    async def _flush_later(self, delay: float):
+        try:
+            await asyncio.sleep(delay)
+            if self._pending is not None:
+                text, kwargs = self._pending
+                self._pending = None
+                try:
+                    await self._show(text, kwargs)
+                except Exception as e:
+                    logging.warning(f"⚠️ Не удалось обновить сообщение: {e}")
+        finally:
+            self._flush_task = None
+
+    async def _show(self, text: str, kwargs: dict):
+        # _shown и _last_edit всегда соответствуют последнему примененному редактированию
+        async with self._lock:
+            state = (text, tuple(sorted((key, repr(value)) for key, value in kwargs.items())))
+            if state == self._shown:
+                return
+
+            if self._sent is None:
+                self._sent = await self._message.answer(text, **kwargs)
+            else:
+                try:
+                    await self._sent.edit_text(text, **kwargs)
+                except MessageNotModified:
+                    pass
+            self._shown = state
+            self._last_edit = asyncio.get_running_loop().time()
+
+
+# Проверка: итоговый текст во время отложенного редактирования
+if __name__ == "__main__":
+    class FakeMessage:
+        """Сообщение, у которого редактирование промежуточной стадии задерживается"""
+
+        def __init__(self):
+            self.edits = []
+            self.editing = asyncio.Event()
+
+        async def answer(self, text: str, **kwargs):
+            self.edits.append(text)
+            return self
+
+        async def edit_text(self, text: str, **kwargs):
+            if text == 'стадия 2':
+                self.editing.set()
+                await asyncio.sleep(0.2)
+            self.edits.append(text)
+
+    async def check():
+        message = FakeMessage()
+        session = ReplySession(message, min_interval=0.05)
+        await session.update('стадия 1')
+        await session.update('стадия 2')
+        await message.editing.wait()
+
+        await session.finish('ИТОГ')
+        await asyncio.sleep(0.3)
+
+        assert message.edits[-1] == 'ИТОГ', message.edits
+        assert session._shown[0] == 'ИТОГ', session._shown
+        assert session._flush_task is None
+        print(f"✅ Редактирования: {message.edits}")
+
+    asyncio.run(check())
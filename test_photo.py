@@ -6,15 +6,11 @@
 import logging
 import base64
 import requests
-from openai import OpenAI
-from config import OPENAI_API_KEY
+from photo_analysis import get_client
 
 # Настройка логирования
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-# Инициализация OpenAI
-client = OpenAI(api_key=OPENAI_API_KEY)
-
 def analyze_photo_test(image_path: str) -> dict:
     """Тестовая функция анализа фотографии"""
     try:
@@ -47,7 +43,7 @@ def analyze_photo_test(image_path: str) -> dict:
         
         # Отправляем запрос в OpenAI Vision API
         logging.info("🧠 Отправляю запрос в OpenAI Vision API...")
-        openai_response = client.chat.completions.create(
+        openai_response = get_client().chat.completions.create(
             model="gpt-4.1",
             messages=[
                 {